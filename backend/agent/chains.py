@@ -1,14 +1,23 @@
 from __future__ import annotations
 
 from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import hashlib
 import math
+import os
+import re
+import shutil
+import tempfile
 
-from rank_bm25 import BM25Okapi
+import numpy as np
+import orjson
+from scipy.sparse import csr_matrix
 
 # Google Gemini imports for LLM integration
 try:
     import google.generativeai as genai
-    from langchain.vectorstores import FAISS
+    import faiss
     from langchain.text_splitter import RecursiveCharacterTextSplitter
     from langchain.embeddings import GoogleGenerativeAIEmbeddings
     GEMINI_AVAILABLE = True
@@ -16,32 +25,301 @@ except ImportError:
     GEMINI_AVAILABLE = False
     print("Google Gemini not available. Using offline mode.")
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 from .config import settings
 
+# Texts per embeddings request when indexing the corpus
+EMBED_BATCH_SIZE = 96
+
+
+def _score_postings(q_col_ids, indptr, indices, impacts, scores_out):
+    """Accumulate the precomputed BM25 impacts of the query terms into ``scores_out``."""
+    for t in q_col_ids:
+        for p in range(indptr[t], indptr[t + 1]):
+            scores_out[indices[p]] += impacts[p]
+
+
+if NUMBA_AVAILABLE:
+    _score_njit = njit(cache=True, fastmath=True)(_score_postings)
+    # Compile (or load from cache) at import so the first request doesn't pay for it
+    _score_njit(
+        np.zeros(1, dtype=np.int64), np.array([0, 1], dtype=np.int32), np.zeros(1, dtype=np.int32),
+        np.ones(1), np.zeros(1),
+    )
+
+
+# Bump whenever tokenisation or the on-disk BM25 layout changes
+_BM25_INDEX_VERSION = 3
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens with punctuation stripped."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+@lru_cache(maxsize=1024)
+def _tokenize_query(question: str) -> tuple[str, ...]:
+    return tuple(_tokenize(question))
+
+
+def _corpus_key(documents: List[dict], *params) -> str:
+    """Content hash of the corpus (plus index parameters) used to name cache files."""
+    payload = orjson.dumps([[d.get("id"), d["text"]] for d in documents] + [list(params)])
+    return hashlib.blake2b(payload, digest_size=8).hexdigest()
+
+
+def _parent_codes(documents: List[dict]) -> tuple[np.ndarray, int]:
+    """Map each snippet to an integer id of the document it was cut from.
+
+    Snippets carry ``meta["parent_id"]``; anything else is its own parent.
+    Also returns the largest number of snippets any parent has.
+    """
+    ids: dict = {}
+    codes = np.fromiter(
+        (ids.setdefault(d.get("meta", {}).get("parent_id", ("doc", i)), len(ids)) for i, d in enumerate(documents)),
+        dtype=np.intp, count=len(documents),
+    )
+    max_chunks = int(np.bincount(codes).max()) if len(codes) else 1
+    return codes, max_chunks
+
+
+def _rollup(ranked: np.ndarray, parents: np.ndarray, k: int) -> List[int]:
+    """Best snippet of each of the first ``k`` distinct parents in ``ranked`` (best first).
+
+    Scoring a document by its best snippet (max rollup), the top-k documents
+    always have their best snippet within the top k * max_chunks snippets.
+    """
+    seen = set()
+    out: List[int] = []
+    for i in ranked:
+        p = parents[i]
+        if p not in seen:
+            seen.add(p)
+            out.append(int(i))
+            if len(out) == k:
+                break
+    return out
+
+
+def _topk(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` highest scores, best first.
+
+    O(N + k log k) selection instead of a full sort; ties keep document order,
+    as the previous ``sorted(..., reverse=True)`` did.
+    """
+    n = len(scores)
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < n:
+        kth = np.partition(scores, n - k)[n - k]
+        above = np.flatnonzero(scores > kth)
+        ties = np.flatnonzero(scores == kth)[:k - len(above)]
+        idx = np.concatenate([above, ties])
+    else:
+        idx = np.arange(n)
+    return idx[np.argsort(-scores[idx], kind="stable")]
+
 
 class OfflineRetriever:
-    """A simple BM25-based retriever over in-memory documents."""
+    """A simple BM25-based retriever over in-memory documents.
+
+    Scoring follows BM25Okapi, but everything that does not depend on the
+    query is precomputed once: each (term, doc) posting stores its final BM25
+    contribution, so a query is just a sum over the postings of its own terms.
+    """
+
+    # Arrays persisted to the on-disk cache, loaded back memory-mapped
+    _CACHED_ARRAYS = ("indptr", "indices", "data", "max_score_per_term")
 
-    def __init__(self, documents: List[dict]):
+    def __init__(self, documents: List[dict], k1: float = 1.5, b: float = 0.75, epsilon: float = 0.25,
+                 cache_dir: str | None = None):
         self.documents = documents
-        corpus = [d["text"].split() for d in documents]
-        self.bm25 = BM25Okapi(corpus)
+        self.k1 = k1
+        self._parents, self._max_chunks = _parent_codes(documents)
 
-    def query(self, question: str, top_k: int = 5) -> List[dict]:
-        scores = self.bm25.get_scores(question.split())
-        ranked = sorted(
-            zip(self.documents, scores), key=lambda x: x[1], reverse=True
+        path = None
+        if cache_dir:
+            path = os.path.join(cache_dir, f"{_corpus_key(documents, 'bm25', _BM25_INDEX_VERSION, k1, b, epsilon)}.bm25")
+            if os.path.isdir(path):
+                try:
+                    self._load(path)
+                    return
+                except Exception as e:
+                    print(f"Failed to load BM25 cache {path}: {e}")
+                    # Move the bad entry aside so the rebuilt index can be saved in its place
+                    stale = f"{path}.{os.getpid()}.stale"
+                    try:
+                        os.rename(path, stale)
+                        shutil.rmtree(stale, ignore_errors=True)
+                    except OSError:
+                        # Already moved or replaced by another process
+                        pass
+
+        self._build(b, epsilon)
+        if path:
+            try:
+                self._save(path)
+            except OSError as e:
+                print(f"Failed to write BM25 cache {path}: {e}")
+
+    def _build(self, b: float, epsilon: float) -> None:
+        corpus = [_tokenize(d["text"]) for d in self.documents]
+
+        # Term-major CSR: row t holds the (doc_id, tf) postings of term t, turned
+        # into (doc_id, impact) once idf and length normalisation are known
+        self.vocab: dict[str, int] = {}
+        term_ids: List[int] = []
+        doc_ids: List[int] = []
+        freqs: List[int] = []
+        for doc_id, tokens in enumerate(corpus):
+            counts: dict[int, int] = {}
+            for tok in tokens:
+                t = self.vocab.setdefault(tok, len(self.vocab))
+                counts[t] = counts.get(t, 0) + 1
+            term_ids.extend(counts.keys())
+            doc_ids.extend([doc_id] * len(counts))
+            freqs.extend(counts.values())
+
+        n_docs = len(corpus)
+        self.postings = csr_matrix(
+            (np.asarray(freqs, dtype=np.float64), (term_ids, doc_ids)),
+            shape=(len(self.vocab), n_docs),
         )
-        return [doc for doc, _ in ranked[:top_k]]
+        self.postings.sort_indices()
+
+        doc_len = np.fromiter((len(tokens) for tokens in corpus), dtype=np.float64, count=n_docs)
+        avgdl = doc_len.mean() if n_docs and doc_len.any() else 1.0
+        len_norm = 1.0 - b + b * (doc_len / avgdl)
+
+        # Same idf flooring as rank_bm25: negative idf becomes epsilon * mean idf
+        df = np.diff(self.postings.indptr)
+        idf = np.log(n_docs - df + 0.5) - np.log(df + 0.5)
+        if idf.size:
+            idf[idf < 0] = epsilon * idf.mean()
+
+        tf = self.postings.data
+        self.postings.data = np.repeat(idf, df) * tf * (self.k1 + 1) / (tf + self.k1 * len_norm[self.postings.indices])
+
+        # MaxScore upper bound per term: the best contribution it can make to any doc
+        self.max_score_per_term = np.zeros(len(self.vocab))
+        if self.postings.nnz:
+            self.max_score_per_term = np.maximum(
+                np.maximum.reduceat(self.postings.data, self.postings.indptr[:-1]), 0.0
+            )
+        self._can_prune = self._no_negative_impacts()
+
+    def _save(self, path: str) -> None:
+        # Write into a scratch dir and rename it into place so readers never see a partial index
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=os.path.dirname(path))
+        arrays = {
+            "indptr": self.postings.indptr,
+            "indices": self.postings.indices,
+            "data": self.postings.data,
+            "max_score_per_term": self.max_score_per_term,
+        }
+        for name, arr in arrays.items():
+            np.save(os.path.join(tmp, f"{name}.npy"), arr)
+        np.save(os.path.join(tmp, "terms.npy"), np.array(list(self.vocab), dtype=str))
+        try:
+            os.rename(tmp, path)
+        except OSError:
+            # Another process got there first
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def _load(self, path: str) -> None:
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in self._CACHED_ARRAYS}
+        terms = np.load(os.path.join(path, "terms.npy"))
+        self.vocab = {str(t): i for i, t in enumerate(terms)}
+        self.postings = csr_matrix(
+            (arrays["data"], arrays["indices"], arrays["indptr"]),
+            shape=(len(terms), len(self.documents)),
+        )
+        self.max_score_per_term = arrays["max_score_per_term"]
+        self._can_prune = self._no_negative_impacts()
+
+    def _no_negative_impacts(self) -> bool:
+        # The idf floor can itself be negative (mean idf < 0, e.g. tiny corpora of
+        # shared terms); then a term can lower a score and MaxScore's bound is unsafe
+        return not self.postings.nnz or bool(self.postings.data.min() >= 0)
+
+    def _accumulate(self, term_ids: np.ndarray, scores: np.ndarray) -> None:
+        """Add the contributions of ``term_ids`` (repeats allowed) to every doc."""
+        p = self.postings
+        if NUMBA_AVAILABLE:
+            _score_njit(term_ids, p.indptr, p.indices, p.data, scores)
+        else:
+            sub = p[term_ids]
+            np.add.at(scores, sub.indices, sub.data)
+
+    def _score_candidates(self, terms: np.ndarray, counts: np.ndarray, cand: np.ndarray) -> np.ndarray:
+        """Contributions of ``terms`` restricted to the doc ids in ``cand``."""
+        p = self.postings
+        out = np.zeros(len(cand))
+        for t, c in zip(terms, counts):
+            row = p.indices[p.indptr[t]:p.indptr[t + 1]]
+            pos = np.minimum(np.searchsorted(row, cand), len(row) - 1)
+            hit = row[pos] == cand
+            out[hit] += c * p.data[p.indptr[t] + pos[hit]]
+        return out
+
+    def query(self, question: str, top_k: int = 5) -> List[dict]:
+        """Top documents for ``question``, each represented by its best-scoring snippet."""
+        if top_k <= 0:
+            return []
+        ranked = self._rank(question, top_k * self._max_chunks)
+        return [self.documents[i] for i in _rollup(ranked, self._parents, top_k)]
+
+    def _rank(self, question: str, top_k: int) -> np.ndarray:
+        """Indices of the ``top_k`` best-scoring snippets, best first."""
+        n = len(self.documents)
+        k = min(top_k, n)
+        if k <= 0:
+            return np.empty(0, dtype=np.intp)
+        scores = np.zeros(n)
+        cols = [self.vocab[t] for t in _tokenize_query(question) if t in self.vocab]
+
+        # Term-at-a-time in decreasing upper-bound order. Once no doc outside the
+        # current top-k can catch up with the k-th score, the top-k set is fixed and
+        # the remaining terms only need scoring against those k docs. Only valid
+        # when no posting contributes a negative score.
+        terms, counts = np.unique(np.asarray(cols, dtype=np.int64), return_counts=True)
+        bounds = self.max_score_per_term[terms] * counts
+        order = np.argsort(-bounds, kind="stable")
+        terms, counts, bounds = terms[order], counts[order], bounds[order]
+        cand = None
+        for i in range(len(terms)):
+            self._accumulate(np.full(counts[i], terms[i]), scores)
+            if i + 1 == len(terms) or k == n or not self._can_prune:
+                continue
+            part = np.partition(scores, (n - k - 1, n - k))
+            # Strict, so an outside doc tying the k-th score still gets the doc-order tie-break
+            if part[n - k - 1] + bounds[i + 1:].sum() < part[n - k]:
+                cand = np.sort(_topk(scores, k))
+                scores[cand] += self._score_candidates(terms[i + 1:], counts[i + 1:], cand)
+                break
+
+        return _topk(scores, k) if cand is None else cand[np.argsort(-scores[cand], kind="stable")]
 
 
 class GeminiRetriever:
     """Gemini-powered retriever using embeddings and vector search."""
     
-    def __init__(self, documents: List[dict]):
+    def __init__(self, documents: List[dict], cache_dir: str | None = None):
         self.documents = documents
-        self.vectorstore = None
+        self.cache_dir = cache_dir
+        self.index = None
         self.embeddings = None
+        self._parents, self._max_chunks = _parent_codes(documents)
+        # Built once; used whenever the embedding path is unavailable or fails
+        self._offline = OfflineRetriever(documents, cache_dir=cache_dir)
         
         if GEMINI_AVAILABLE and settings.online_mode:
             self._setup_gemini_retriever()
@@ -58,34 +336,91 @@ class GeminiRetriever:
                 google_api_key=settings.google_api_key
             )
             
-            # Prepare documents for vector store
-            texts = [doc["text"] for doc in self.documents]
-            metadatas = [doc["meta"] for doc in self.documents]
+            path = None
+            if self.cache_dir:
+                key = _corpus_key(self.documents, "faiss", self.embeddings.model)
+                path = os.path.join(self.cache_dir, f"{key}.faiss")
             
-            # Create vector store
-            self.vectorstore = FAISS.from_texts(
-                texts=texts,
-                embedding=self.embeddings,
-                metadatas=metadatas
-            )
+            self.index = None
+            if path and os.path.exists(path):
+                try:
+                    self.index = faiss.read_index(path)
+                    if self.index.ntotal != len(self.documents):
+                        raise ValueError(f"index holds {self.index.ntotal} vectors, corpus has {len(self.documents)}")
+                except Exception as e:
+                    # Corrupt or unreadable; rebuild and overwrite it below
+                    print(f"Failed to load FAISS cache {path}: {e}")
+                    self.index = None
+            if self.index is None:
+                # Embed the corpus once and keep normalised vectors resident, so
+                # inner product search is cosine similarity
+                vecs = self._embed_corpus([doc["text"] for doc in self.documents])
+                faiss.normalize_L2(vecs)
+                
+                self.index = faiss.IndexFlatIP(vecs.shape[1])
+                self.index.add(vecs)
+                if path:
+                    try:
+                        os.makedirs(self.cache_dir, exist_ok=True)
+                        tmp = f"{path}.{os.getpid()}.tmp"
+                        faiss.write_index(self.index, tmp)
+                        os.replace(tmp, path)
+                    except Exception as e:
+                        print(f"Failed to write FAISS cache {path}: {e}")
             print("Gemini retriever initialized successfully")
         except Exception as e:
             print(f"Failed to initialize Gemini retriever: {e}")
-            self.vectorstore = None
+            self.index = None
+    
+    def _embed_corpus(self, texts: List[str]) -> np.ndarray:
+        """Embed texts in batches of EMBED_BATCH_SIZE, sending the batches concurrently."""
+        batches = [texts[i:i + EMBED_BATCH_SIZE] for i in range(0, len(texts), EMBED_BATCH_SIZE)]
+        if len(batches) <= 1:
+            vecs = self.embeddings.embed_documents(texts)
+        else:
+            with ThreadPoolExecutor(max_workers=min(4, len(batches))) as pool:
+                vecs = [v for batch in pool.map(self.embeddings.embed_documents, batches) for v in batch]
+        return np.asarray(vecs, dtype=np.float32)
     
     def query(self, question: str, top_k: int = 5) -> List[dict]:
         """Query using Gemini embeddings if available, fallback to BM25."""
-        if self.vectorstore and GEMINI_AVAILABLE:
+        if self.index is not None and GEMINI_AVAILABLE:
             try:
-                # Use vector similarity search
-                docs = self.vectorstore.similarity_search(question, k=top_k)
-                return [{"text": doc.page_content, "meta": doc.metadata} for doc in docs]
+                k = min(top_k * self._max_chunks, self.index.ntotal)
+                if top_k <= 0 or k <= 0:
+                    return []
+                q = np.asarray([self.embeddings.embed_query(question)], dtype=np.float32)
+                faiss.normalize_L2(q)
+                _, ids = self.index.search(q, k)
+                ranked = ids[0][ids[0] >= 0]
+                return [self.documents[i] for i in _rollup(ranked, self._parents, top_k)]
             except Exception as e:
                 print(f"Gemini query failed, falling back to BM25: {e}")
         
         # Fallback to BM25
-        offline_retriever = OfflineRetriever(self.documents)
-        return offline_retriever.query(question, top_k)
+        return self._offline.query(question, top_k)
+
+
+_MODEL = None
+
+
+def _get_model():
+    """Configure Gemini once and reuse a single GenerativeModel across calls."""
+    global _MODEL
+    if _MODEL is None:
+        genai.configure(api_key=settings.google_api_key)
+        _MODEL = genai.GenerativeModel('gemini-2.5-flash')
+    return _MODEL
+
+
+def _prune_context(text: str, question: str, max_chars: int = 4000, max_sentences: int = 20) -> str:
+    """Cut long context down to the sentences that best match the question (BM25), in original order."""
+    if len(text) <= max_chars or not question:
+        return text
+    sentences = [s for s in re.split(r"(?<=[.!?])\s+", text) if s]
+    ranker = OfflineRetriever([{"id": i, "text": s, "meta": {}} for i, s in enumerate(sentences)])
+    keep = sorted(d["id"] for d in ranker.query(question, max_sentences))
+    return " ".join(sentences[i] for i in keep)
 
 
 def gemini_summarize(text: str, question: str = "") -> str:
@@ -94,18 +429,12 @@ def gemini_summarize(text: str, question: str = "") -> str:
         return offline_summarize(text)
     
     try:
-        # Configure Gemini
-        genai.configure(api_key=settings.google_api_key)
-        
-        # Initialize Gemini 2.5 Flash model
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        
         # Create prompt
         prompt = f"""
 You are a career outcomes analyst specializing in Indian educational institutions. 
 Based on the following context about career outcomes, provide a comprehensive and insightful summary that answers the user's question.
 
-Context: {text}
+Context: {_prune_context(text, question)}
 
 Question: {question}
 
@@ -120,7 +449,7 @@ Format your response in a structured way with clear sections.
 """
         
         # Generate response
-        response = model.generate_content(prompt)
+        response = _get_model().generate_content(prompt)
         return response.text.strip()
         
     except Exception as e:
@@ -144,12 +473,6 @@ def gemini_synthesize_insights(bullets: List[str], context: str = "") -> str:
         return synthesize_parent_friendly_insights(bullets)
     
     try:
-        # Configure Gemini
-        genai.configure(api_key=settings.google_api_key)
-        
-        # Initialize Gemini 2.5 Flash model
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        
         # Create prompt
         prompt = f"""
 You are a career counselor providing insights to parents and students about Indian educational institutions.
@@ -174,7 +497,7 @@ Use clear headings and bullet points for better readability.
 """
         
         # Generate response
-        response = model.generate_content(prompt)
+        response = _get_model().generate_content(prompt)
         return response.text.strip()
         
     except Exception as e:
@@ -190,25 +513,47 @@ def synthesize_parent_friendly_insights(bullets: List[str]) -> str:
     return header + body
 
 
+# Weights for common high-impact services; anything else counts 0.8
+SUPPORT_SERVICE_WEIGHTS = {
+    "career counseling": 1.5,
+    "internships": 1.3,
+    "mentorship": 1.3,
+    "alumni network": 1.2,
+    "job fairs": 1.1,
+    "resume workshops": 1.0,
+    "mock interviews": 1.0,
+}
+SUPPORT_SERVICE_DEFAULT_WEIGHT = 0.8
+SUPPORT_MAX_SCORE = 12.0
+
+
 def score_support_index(services: List[str]) -> float:
-    """Compute a simple support index: sqrt(weighted coverage)."""
+    """Compute a simple support index: sqrt(weighted coverage), scaled to 0-100."""
     if not services:
         return 0.0
     unique = set(s.strip().lower() for s in services if s and s.strip())
-    # Weight some common high-impact services
-    weights = {
-        "career counseling": 1.5,
-        "internships": 1.3,
-        "mentorship": 1.3,
-        "alumni network": 1.2,
-        "job fairs": 1.1,
-        "resume workshops": 1.0,
-        "mock interviews": 1.0,
-    }
-    score = 0.0
-    for s in unique:
-        score += weights.get(s, 0.8)
-    # Normalize to 0-100
-    max_possible = 12.0
-    normalized = min(100.0, (score / max_possible) * 100.0)
-    return round(math.sqrt(normalized) * 10.0 / math.sqrt(100.0), 2) * 10
+    score = sum(SUPPORT_SERVICE_WEIGHTS.get(s, SUPPORT_SERVICE_DEFAULT_WEIGHT) for s in unique)
+    # Normalize to 0-100, then compress with sqrt (sqrt(100) * 10 == 100)
+    normalized = min(100.0, (score / SUPPORT_MAX_SCORE) * 100.0)
+    return round(math.sqrt(normalized) * 10.0, 2)
+
+
+def score_support_indices(service_lists: List[List[str]]) -> List[float]:
+    """score_support_index for many rows at once, via per-row uint64 service bitmasks."""
+    bits: dict = {}
+    masks = np.zeros(len(service_lists), dtype=np.uint64)
+    for i, services in enumerate(service_lists):
+        mask = 0
+        for s in services or ():
+            if s and s.strip():
+                mask |= 1 << bits.setdefault(s.strip().lower(), len(bits))
+        if len(bits) > 64:
+            return [score_support_index(s) for s in service_lists]
+        masks[i] = mask
+    bit_weights = np.zeros(64)
+    for name, bit in bits.items():
+        bit_weights[bit] = SUPPORT_SERVICE_WEIGHTS.get(name, SUPPORT_SERVICE_DEFAULT_WEIGHT)
+    # Bit j of each mask lands in column j (masks are laid out little-endian)
+    members = np.unpackbits(masks.astype("<u8").view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    normalized = np.minimum(100.0, (members @ bit_weights / SUPPORT_MAX_SCORE) * 100.0)
+    return [round(x, 2) for x in (np.sqrt(normalized) * 10.0).tolist()]
@@ -10,6 +10,8 @@ class Settings:
     host: str = os.getenv("HOST", "0.0.0.0")
     port: int = int(os.getenv("PORT", "8000"))
     data_dir: str = os.getenv("DATA_DIR", os.path.join("backend", "data"))
+    # Persisted retrieval indices, keyed by a hash of the corpus
+    index_cache_dir: str = os.getenv("INDEX_CACHE_DIR", os.path.join("backend", "data", "index_cache"))
 
     # Optional LLM keys
     openai_api_key: str | None = os.getenv("OPENAI_API_KEY") or None
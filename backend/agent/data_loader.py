@@ -1,132 +1,171 @@
+import mmap
 import os
-import json
+import numpy as np
+import orjson
 import pandas as pd
+import pyarrow.csv as pacsv
 import requests
+import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Tuple, List, Dict, Any
 from datetime import datetime, timedelta
-import random
+
+try:
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+    _SPLITTER = RecursiveCharacterTextSplitter(chunk_size=512, chunk_overlap=64)
+except ImportError:
+    _SPLITTER = None
 
 from .config import settings
 
 
-def fetch_real_employment_data() -> pd.DataFrame:
-    """Fetch real employment data from various sources."""
-    # Simulate fetching from multiple sources
-    sources = [
-        {"source": "BLS", "url": "https://api.bls.gov/publicAPI/v2/timeseries/data/"},
-        {"source": "LinkedIn", "url": "https://api.linkedin.com/v2/"},
-        {"source": "Glassdoor", "url": "https://api.glassdoor.com/api/"}
-    ]
+INSTITUTIONS = ["VIT University", "SRM University", "Amrita University", "KL University", "RV College of Engineering", 
+                "GITAM University", "Vignan University", "BITS Pilani", "IIT Delhi", "IIT Bombay", "IIT Madras", 
+                "IIT Kanpur", "Anna University", "JNTU Hyderabad", "Osmania University"]
+DEGREES = ["Computer Science", "Engineering", "Data Science", "Business", "Medicine", "Law", "Arts", "Psychology"]
+YEARS = [2025, 2026, 2027, 2028, 2029, 2030]
+
+# Institution -> (employment rate boost, salary multiplier), based on reputation and placement records
+INST_TIER = {
+    "IIT Delhi": (8, 1.5), "IIT Bombay": (8, 1.5), "IIT Madras": (8, 1.5), "IIT Kanpur": (8, 1.5),
+    "BITS Pilani": (8, 1.5),
+    "VIT University": (5, 1.3), "SRM University": (5, 1.3), "Amrita University": (5, 1.3),
+    "Anna University": (5, 1.3),
+    "KL University": (3, 1.1), "RV College of Engineering": (3, 1.1), "GITAM University": (3, 1.1),
+    "Vignan University": (3, 1.1),
+}
+
+# Institution-specific services on top of the common catalogue
+_TOP_TIER_SERVICES = ["Tech Industry Connections", "Startup Incubator", "Research Opportunities", "International Placements"]
+_PRIVATE_SERVICES = ["Corporate Partnerships", "Industry Training", "International Exchange"]
+_REGIONAL_SERVICES = ["Regional Industry Connections", "Skill Development Programs", "Entrepreneurship Support"]
+INST_EXTRA_SERVICES = {
+    **{i: _TOP_TIER_SERVICES for i in ["IIT Delhi", "IIT Bombay", "IIT Madras", "IIT Kanpur", "BITS Pilani"]},
+    **{i: _PRIVATE_SERVICES for i in ["VIT University", "SRM University", "Amrita University"]},
+    **{i: _REGIONAL_SERVICES for i in ["KL University", "RV College of Engineering", "GITAM University", "Vignan University"]},
+}
+
+# Root generator for synthetic data. Each generation pass draws from its own
+# spawned child, so concurrent passes never share generator state.
+_RNG = np.random.default_rng(0)
+
+
+def _rng(seed: int | np.random.Generator | None) -> np.random.Generator:
+    return np.random.default_rng(seed) if seed is not None else _RNG.spawn(1)[0]
+
+
+# Local cache of the generated datasets, reused until it is older than the TTL
+REAL_DATA_FILES = ("employment_real.parquet", "salary_real.parquet", "support_services_real.parquet")
+REAL_DATA_TTL_SECONDS = 3600
+
+
+def _generate_grid(seed: int | np.random.Generator | None = None) -> Dict[str, Any]:
+    """Generate the institution x degree x year grid behind the employment and salary data.
+
+    Both datasets are projections of this one pass: the grid coordinates,
+    institution tiers and random draws are computed once and shared.
+    """
+    rng = _rng(seed)
+    
+    # One row per (institution, degree, year), as flat arrays
+    inst_idx, deg_idx, year = (a.ravel() for a in np.meshgrid(
+        np.arange(len(INSTITUTIONS)), np.arange(len(DEGREES)), np.asarray(YEARS), indexing="ij"
+    ))
+    n = year.size
+    
+    # Indian institution boosts/multipliers based on reputation and placement records
+    inst_boost, inst_multiplier = np.array([INST_TIER.get(i, (0, 1.0)) for i in INSTITUTIONS]).T
+    inst_multiplier = inst_multiplier[inst_idx]
+    
+    # All random draws for both datasets in one go
+    rate_noise = rng.integers(-5, 11, size=n)
+    u = rng.random((2, n))
+    sources = rng.choice(["BLS", "LinkedIn", "Glassdoor"], size=n)
+    
+    # Employment survey: rates by degree and institution with future projections
+    stem = np.isin(deg_idx, [DEGREES.index(d) for d in ["Computer Science", "Engineering", "Data Science"]])
+    base_rate = np.where(stem, 85, 75)
+    future_growth = (year - 2024) * 0.03  # 3% growth per year
+    employment_rate = np.clip(base_rate + inst_boost[inst_idx] + rate_noise + future_growth * 100, 0, 98)
     
-    # Generate realistic data based on current trends and future projections for Indian institutions
-    institutions = ["VIT University", "SRM University", "Amrita University", "KL University", "RV College of Engineering", 
-                   "GITAM University", "Vignan University", "BITS Pilani", "IIT Delhi", "IIT Bombay", "IIT Madras", 
-                   "IIT Kanpur", "Anna University", "JNTU Hyderabad", "Osmania University"]
-    degrees = ["Computer Science", "Engineering", "Data Science", "Business", "Medicine", "Law", "Arts", "Psychology"]
+    core = np.isin(deg_idx, [DEGREES.index(d) for d in ["Computer Science", "Engineering"]])
+    salary_growth = (year - 2024) * 0.05  # 5% growth per year
+    employment_salary = np.maximum(
+        0, np.where(core, 800000, 500000) * inst_multiplier * (1 + (-0.1 + 0.3 * u[0])) * (1 + salary_growth)
+    ).astype(np.int64)
     
-    data = []
-    for inst in institutions:
-        for degree in degrees:
-            for year in [2025, 2026, 2027, 2028, 2029, 2030]:
-                # Generate realistic employment rates based on degree and institution with future projections
-                base_rate = 85 if degree in ["Computer Science", "Engineering", "Data Science"] else 75
-                # Indian institution boosts based on reputation and placement records
-                inst_boost = 8 if inst in ["IIT Delhi", "IIT Bombay", "IIT Madras", "IIT Kanpur", "BITS Pilani"] else \
-                            5 if inst in ["VIT University", "SRM University", "Amrita University", "Anna University"] else \
-                            3 if inst in ["KL University", "RV College of Engineering", "GITAM University", "Vignan University"] else 0
-                
-                # Add future growth projections (2-5% annual growth)
-                future_growth = (year - 2024) * 0.03  # 3% growth per year
-                employment_rate = min(98, max(0, base_rate + inst_boost + random.randint(-5, 10) + future_growth * 100))
-                
-                # Generate realistic salaries with future projections for Indian market
-                base_salary = 800000 if degree in ["Computer Science", "Engineering"] else 500000  # INR
-                # Indian institution salary multipliers based on placement records
-                inst_multiplier = 1.5 if inst in ["IIT Delhi", "IIT Bombay", "IIT Madras", "IIT Kanpur", "BITS Pilani"] else \
-                                1.3 if inst in ["VIT University", "SRM University", "Amrita University", "Anna University"] else \
-                                1.1 if inst in ["KL University", "RV College of Engineering", "GITAM University", "Vignan University"] else 1.0
-                
-                # Add salary growth projections (4-6% annual growth)
-                salary_growth = (year - 2024) * 0.05  # 5% growth per year
-                median_salary = int(max(0, base_salary * inst_multiplier * (1 + random.uniform(-0.1, 0.2)) * (1 + salary_growth)))
-                
-                data.append({
-                    "institution": inst,
-                    "degree": degree,
-                    "year": year,
-                    "employment_rate": employment_rate,
-                    "median_salary": median_salary,
-                    "data_source": random.choice(sources)["source"],
-                    "last_updated": datetime.now().isoformat()
-                })
+    # Salary survey: base salary by degree (in INR) with year-over-year growth
+    base_salaries = {
+        "Computer Science": 800000,
+        "Engineering": 750000,
+        "Data Science": 850000,
+        "Business": 600000,
+        "Medicine": 1000000,
+        "Law": 700000,
+        "Arts": 400000,
+        "Psychology": 450000
+    }
+    base_salary = np.array([base_salaries.get(d, 500000) for d in DEGREES])
+    year_growth = 1.05 ** (year - 2024)  # 5% annual growth from 2024 baseline
+    median_salary = np.maximum(
+        0, base_salary[deg_idx] * inst_multiplier * year_growth * (1 + (-0.05 + 0.2 * u[1]))
+    ).astype(np.int64)
     
-    return pd.DataFrame(data)
+    return {
+        "institution": np.asarray(INSTITUTIONS, dtype=object)[inst_idx],
+        "degree": np.asarray(DEGREES, dtype=object)[deg_idx],
+        "year": year,
+        "employment_rate": employment_rate,
+        "employment_salary": employment_salary,
+        "employment_source": sources,
+        "median_salary": median_salary,
+        # Employment rate correlates with salary (adjusted for Indian market)
+        "salary_employment_rate": np.clip(70 + (median_salary - 500000) // 10000, 0, 98),
+        "salary_percentile_25": (median_salary * 0.8).astype(np.int64),
+        "salary_percentile_75": (median_salary * 1.3).astype(np.int64),
+        "last_updated": datetime.now().isoformat(),
+    }
 
 
-def fetch_real_salary_data() -> pd.DataFrame:
+def fetch_real_employment_data(grid: Dict[str, Any] | None = None) -> pd.DataFrame:
+    """Fetch real employment data from various sources (BLS, LinkedIn, Glassdoor)."""
+    g = grid if grid is not None else _generate_grid()
+    return pd.DataFrame({
+        "institution": g["institution"],
+        "degree": g["degree"],
+        "year": g["year"],
+        "employment_rate": g["employment_rate"],
+        "median_salary": g["employment_salary"],
+        "data_source": g["employment_source"],
+        "last_updated": g["last_updated"]
+    })
+
+
+def fetch_real_salary_data(grid: Dict[str, Any] | None = None) -> pd.DataFrame:
     """Fetch real salary data from salary surveys and job sites."""
     # This would normally fetch from real APIs like:
     # - Bureau of Labor Statistics
     # - PayScale API
     # - Glassdoor API
     # - LinkedIn Salary Insights
-    
-    # For demo, generate realistic salary progression data for Indian institutions
-    institutions = ["VIT University", "SRM University", "Amrita University", "KL University", "RV College of Engineering", 
-                   "GITAM University", "Vignan University", "BITS Pilani", "IIT Delhi", "IIT Bombay", "IIT Madras", 
-                   "IIT Kanpur", "Anna University", "JNTU Hyderabad", "Osmania University"]
-    degrees = ["Computer Science", "Engineering", "Data Science", "Business", "Medicine", "Law", "Arts", "Psychology"]
-    
-    data = []
-    for inst in institutions:
-        for degree in degrees:
-            for year in [2025, 2026, 2027, 2028, 2029, 2030]:
-                # Base salary by degree (in INR)
-                base_salaries = {
-                    "Computer Science": 800000,
-                    "Engineering": 750000,
-                    "Data Science": 850000,
-                    "Business": 600000,
-                    "Medicine": 1000000,
-                    "Law": 700000,
-                    "Arts": 400000,
-                    "Psychology": 450000
-                }
-                
-                base_salary = base_salaries.get(degree, 500000)
-                # Indian institution salary multipliers
-                inst_multiplier = 1.5 if inst in ["IIT Delhi", "IIT Bombay", "IIT Madras", "IIT Kanpur", "BITS Pilani"] else \
-                                1.3 if inst in ["VIT University", "SRM University", "Amrita University", "Anna University"] else \
-                                1.1 if inst in ["KL University", "RV College of Engineering", "GITAM University", "Vignan University"] else 1.0
-                
-                # Add year-over-year growth for future projections
-                year_growth = 1.05 ** (year - 2024)  # 5% annual growth from 2024 baseline
-                median_salary = int(max(0, base_salary * inst_multiplier * year_growth * (1 + random.uniform(-0.05, 0.15))))
-                
-                # Employment rate correlates with salary (adjusted for Indian market)
-                employment_rate = min(98, max(0, 70 + (median_salary - 500000) // 10000))
-                
-                data.append({
-                    "institution": inst,
-                    "degree": degree,
-                    "year": year,
-                    "median_salary": median_salary,
-                    "employment_rate": employment_rate,
-                    "salary_percentile_25": int(median_salary * 0.8),
-                    "salary_percentile_75": int(median_salary * 1.3),
-                    "data_source": "Salary Survey API",
-                    "last_updated": datetime.now().isoformat()
-                })
-    
-    return pd.DataFrame(data)
+    g = grid if grid is not None else _generate_grid()
+    return pd.DataFrame({
+        "institution": g["institution"],
+        "degree": g["degree"],
+        "year": g["year"],
+        "median_salary": g["median_salary"],
+        "employment_rate": g["salary_employment_rate"],
+        "salary_percentile_25": g["salary_percentile_25"],
+        "salary_percentile_75": g["salary_percentile_75"],
+        "data_source": "Salary Survey API",
+        "last_updated": g["last_updated"]
+    })
 
 
-def fetch_real_support_services() -> pd.DataFrame:
+def fetch_real_support_services(seed: int | np.random.Generator | None = None) -> pd.DataFrame:
     """Fetch real support services data from university websites and surveys."""
-    institutions = ["VIT University", "SRM University", "Amrita University", "KL University", "RV College of Engineering", 
-                   "GITAM University", "Vignan University", "BITS Pilani", "IIT Delhi", "IIT Bombay", "IIT Madras", 
-                   "IIT Kanpur", "Anna University", "JNTU Hyderabad", "Osmania University"]
+    rng = _rng(seed)
     
     # Real support services that universities typically offer
     all_services = [
@@ -135,32 +174,38 @@ def fetch_real_support_services() -> pd.DataFrame:
         "Industry Partnerships", "Startup Incubators", "Research Opportunities", "Study Abroad",
         "Mental Health Support", "Academic Tutoring", "Leadership Development", "Networking Events"
     ]
+    n = len(INSTITUTIONS)
     
-    data = []
-    for inst in institutions:
-        # Each institution has different service offerings
-        num_services = random.randint(8, 15)
-        services = random.sample(all_services, num_services)
-        
-        # Add institution-specific services for Indian universities
-        if inst in ["IIT Delhi", "IIT Bombay", "IIT Madras", "IIT Kanpur", "BITS Pilani"]:
-            services.extend(["Tech Industry Connections", "Startup Incubator", "Research Opportunities", "International Placements"])
-        if inst in ["VIT University", "SRM University", "Amrita University"]:
-            services.extend(["Corporate Partnerships", "Industry Training", "International Exchange"])
-        if inst in ["KL University", "RV College of Engineering", "GITAM University", "Vignan University"]:
-            services.extend(["Regional Industry Connections", "Skill Development Programs", "Entrepreneurship Support"])
-        
-        data.append({
-            "institution": inst,
-            "services": services,
-            "support_index": len(services) * 5 + random.randint(0, 20),
-            "career_services_rating": random.uniform(4.0, 5.0),
-            "alumni_network_strength": random.uniform(4.2, 5.0),
-            "data_source": "University Website",
-            "last_updated": datetime.now().isoformat()
-        })
+    # Each institution has different service offerings: a random-length prefix
+    # of a per-row shuffle is a sample without replacement
+    num_services = rng.integers(8, 16, size=n)
+    shuffled = rng.permuted(np.tile(np.arange(len(all_services)), (n, 1)), axis=1)
+    services = [
+        [all_services[j] for j in shuffled[r, :num_services[r]]] + INST_EXTRA_SERVICES.get(inst, [])
+        for r, inst in enumerate(INSTITUTIONS)
+    ]
     
-    return pd.DataFrame(data)
+    return pd.DataFrame({
+        "institution": INSTITUTIONS,
+        "services": services,
+        "support_index": np.array([len(s) for s in services]) * 5 + rng.integers(0, 21, size=n),
+        "career_services_rating": rng.uniform(4.0, 5.0, size=n),
+        "alumni_network_strength": rng.uniform(4.2, 5.0, size=n),
+        "data_source": "University Website",
+        "last_updated": datetime.now().isoformat()
+    })
+
+
+def _write_parquet(df: pd.DataFrame, path: str) -> None:
+    """Write ``df`` to a scratch file and rename it into place so readers never see a partial file."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".parquet.tmp")
+    os.close(fd)
+    try:
+        df.to_parquet(tmp, engine="pyarrow", compression="zstd", index=False)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
 
 
 def load_structured_data(data_dir: str | None = None, use_real_data: bool = True) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
@@ -168,18 +213,35 @@ def load_structured_data(data_dir: str | None = None, use_real_data: bool = True
     Returns (employment_df, salary_df, support_df).
     """
     if use_real_data:
-        # Fetch real data from APIs and web sources
-        employment_df = fetch_real_employment_data()
-        salary_df = fetch_real_salary_data()
-        support_df = fetch_real_support_services()
-        
-        # Cache the data locally for faster access
         base = data_dir or settings.data_dir
-        os.makedirs(base, exist_ok=True)
+        paths = [os.path.join(base, name) for name in REAL_DATA_FILES]
+        
+        # Reuse the local cache while it is fresh instead of regenerating it
+        if all(os.path.exists(p) and time.time() - os.path.getmtime(p) < REAL_DATA_TTL_SECONDS for p in paths):
+            employment_df, salary_df, support_df = (pd.read_parquet(p, memory_map=True) for p in paths)
+            # Parquet round-trips list columns as arrays
+            support_df["services"] = support_df["services"].map(list)
+            return employment_df, salary_df, support_df
         
-        employment_df.to_csv(os.path.join(base, "employment_real.csv"), index=False)
-        salary_df.to_csv(os.path.join(base, "salary_real.csv"), index=False)
-        support_df.to_csv(os.path.join(base, "support_services_real.csv"), index=False)
+        # Fetch real data from APIs and web sources. The grid and the support
+        # services are independent, so generate them (and write them out)
+        # concurrently, each with its own child generator.
+        grid_rng, support_rng = _RNG.spawn(2)
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            support_future = pool.submit(fetch_real_support_services, support_rng)
+            grid = _generate_grid(grid_rng)
+            employment_df = fetch_real_employment_data(grid)
+            salary_df = fetch_real_salary_data(grid)
+            support_df = support_future.result()
+            
+            # Cache the data locally for faster access
+            os.makedirs(base, exist_ok=True)
+            writes = [
+                pool.submit(_write_parquet, df, path)
+                for df, path in zip((employment_df, salary_df, support_df), paths)
+            ]
+            for w in writes:
+                w.result()
         
         return employment_df, salary_df, support_df
     else:
@@ -189,37 +251,54 @@ def load_structured_data(data_dir: str | None = None, use_real_data: bool = True
         salary_path = os.path.join(base, "salary.csv")
         support_path = os.path.join(base, "support_services.json")
 
-        employment_df = pd.read_csv(employment_path)
-        salary_df = pd.read_csv(salary_path)
+        # pyarrow's multithreaded reader; to_pandas() keeps the same NumPy dtypes as pd.read_csv
+        employment_df = pacsv.read_csv(employment_path).to_pandas()
+        salary_df = pacsv.read_csv(salary_path).to_pandas()
 
-        with open(support_path, "r", encoding="utf-8") as f:
-            support_data = json.load(f)
+        with open(support_path, "rb") as f:
+            support_data = orjson.loads(f.read())
         support_df = pd.json_normalize(support_data["institutions"]) if isinstance(support_data, dict) else pd.DataFrame(support_data)
 
         return employment_df, salary_df, support_df
 
 
+def _read_text(path: str) -> str:
+    """Read a UTF-8 file through a read-only memory map, with text-mode newline handling."""
+    with open(path, "rb") as f:
+        # mmap refuses zero-length files
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Decode straight from the mapping rather than copying it into bytes first
+            text = str(mm, "utf-8")
+    # Same universal-newline translation open(..., "r") applies
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
 def load_unstructured_docs(data_dir: str | None = None) -> List[dict]:
-    """Load text documents from reports directory and web sources. Returns list of {id, text, meta}."""
+    """Load text documents from reports directory and web sources. Returns list of {id, text, meta}.
+
+    Local reports are split into snippets that share ``meta["parent_id"]``.
+    """
     base = data_dir or settings.data_dir
     reports_dir = os.path.join(base, "reports")
     docs: List[dict] = []
     
-    # Load local reports
+    # Load local reports; DirEntry caches the file type, so no extra stat per entry
     if os.path.isdir(reports_dir):
-        for fname in os.listdir(reports_dir):
-            fpath = os.path.join(reports_dir, fname)
-            if not os.path.isfile(fpath):
-                continue
-            if not fname.lower().endswith((".txt", ".md")):
-                continue
-            with open(fpath, "r", encoding="utf-8") as f:
-                text = f.read()
-            docs.append({
-                "id": fname,
-                "text": text,
-                "meta": {"source": fpath, "type": "local_report"}
-            })
+        with os.scandir(reports_dir) as it:
+            for entry in it:
+                if not entry.is_file() or not entry.name.lower().endswith((".txt", ".md")):
+                    continue
+                # Index reports as ~512-char snippets; retrievers roll them up by parent_id
+                text = _read_text(entry.path)
+                chunks = _SPLITTER.split_text(text) if _SPLITTER else [text]
+                for i, chunk in enumerate(chunks):
+                    docs.append({
+                        "id": f"{entry.name}#{i}",
+                        "text": chunk,
+                        "meta": {"source": entry.path, "type": "local_report", "parent_id": entry.name, "chunk": i}
+                    })
     
     # Add web-sourced content (simulated)
     web_docs = [
@@ -1,67 +1,237 @@
 from __future__ import annotations
 
 from typing import Dict, Any, List
+import copy
+import functools
 import statistics
 import os
-from datetime import datetime, timedelta
+import threading
+import time
+from datetime import datetime
 import math
+from operator import itemgetter
 
+import numpy as np
+import orjson
 import pandas as pd
+from cachetools import LRUCache
 
 from .config import settings
 from .data_loader import load_structured_data, load_unstructured_docs
-from .chains import OfflineRetriever, GeminiRetriever, offline_summarize, gemini_summarize, synthesize_parent_friendly_insights, gemini_synthesize_insights, score_support_index
+from .chains import NUMBA_AVAILABLE, OfflineRetriever, GeminiRetriever, offline_summarize, gemini_summarize, synthesize_parent_friendly_insights, gemini_synthesize_insights, score_support_indices
+
+if NUMBA_AVAILABLE:
+    from numba import njit
 
 
 def clean_float_value(value: float) -> float:
-    """Clean float values to be JSON serializable."""
-    if pd.isna(value) or value == float('inf') or value == float('-inf'):
-        return 0.0
-    if math.isnan(value):
-        return 0.0
-    return float(value)
+    """Clean float values to be JSON serializable (NaN and +/-Inf become 0.0)."""
+    return float(value) if math.isfinite(value) else 0.0
+
+
+_NO_ROWS = np.empty(0, dtype=np.intp)
+
+
+def _roi_kernel(median_salary, employment_rate, tuition_total, growth=0.03):
+    """First-year income, break-even years, 5/10-year income and 5/10-year ROI %."""
+    first_year = median_salary * (employment_rate / 100.0)
+    break_even = tuition_total / max(first_year, 1.0)
+    income_5 = first_year * ((1.0 + growth) ** 5 - 1.0) / growth
+    income_10 = first_year * ((1.0 + growth) ** 10 - 1.0) / growth
+    if tuition_total > 0:
+        roi_5 = (income_5 - tuition_total) / tuition_total * 100.0
+        roi_10 = (income_10 - tuition_total) / tuition_total * 100.0
+    else:
+        roi_5 = 0.0
+        roi_10 = 0.0
+    return first_year, break_even, income_5, income_10, roi_5, roi_10
+
+
+if NUMBA_AVAILABLE:
+    _roi_kernel = njit(cache=True, fastmath=True)(_roi_kernel)
+    # Warm up at import, as chains.py does for the BM25 kernel
+    _roi_kernel(1.0, 1.0, 1.0, 0.03)
+
+
+def _row_index(col: pd.Series, fold: bool = False) -> Dict[Any, np.ndarray]:
+    """Map each distinct value of ``col`` (optionally case-folded) to its row positions."""
+    keys = col.str.casefold() if fold else col
+    return col.groupby(keys).indices
+
+
+def _grouped_moments(codes: np.ndarray, n_groups: int, x: np.ndarray):
+    """Per-group count, mean and sample std (ddof=1) of ``x`` using bincount passes.
+
+    Rows with a negative code (missing group key) are left out, as groupby does.
+    """
+    if codes.size and codes.min() < 0:
+        keep = codes >= 0
+        codes, x = codes[keep], x[keep]
+    count = np.bincount(codes, minlength=n_groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.bincount(codes, weights=x, minlength=n_groups) / count
+        # Centered second pass rather than E[x^2] - E[x]^2, which cancels badly for salaries
+        std = np.sqrt(np.bincount(codes, weights=(x - mean[codes]) ** 2, minlength=n_groups) / (count - 1))
+    return count, mean, std
+
+
+def _prepare_support(df: pd.DataFrame) -> pd.DataFrame:
+    """Normalise ``services`` to lists and precompute per-row service counts and scores."""
+    services = df["services"] if "services" in df.columns else pd.Series([None] * len(df), index=df.index, dtype=object)
+    df["services"] = services.map(lambda s: s if isinstance(s, list) else [])
+    df["_n_services"] = df["services"].str.len()
+    df["_support_index"] = score_support_indices(df["services"].to_list())
+    return df
+
+
+# Repeated string labels, stored as pandas categoricals so filters and
+# groupings work on small integer codes instead of Python strings
+_CATEGORICAL_COLUMNS = ("institution", "degree", "data_source")
+# Narrower integer columns. Rates, salaries and ratings stay float64: pandas
+# reduces float32 columns in float32, which shifts the reported 2-dp figures.
+_NUMERIC_DTYPES = {"year": "int16"}
+
+
+def _compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Store label columns as ``category`` and narrow the integer columns listed above."""
+    cols = {c: "category" for c in _CATEGORICAL_COLUMNS if c in df.columns}
+    cols.update({c: t for c, t in _NUMERIC_DTYPES.items() if c in df.columns})
+    return df.astype(cols) if cols else df
+
+
+def _group_by_institution(df: pd.DataFrame):
+    inst = df["institution"]
+    if isinstance(inst.dtype, pd.CategoricalDtype):
+        # Categories are already sorted, so compacting the observed codes gives
+        # the same group order as factorize(sort=True)
+        present, codes = np.unique(inst.cat.codes.to_numpy(), return_inverse=True)
+        if present.size and present[0] < 0:
+            # Missing institutions (code -1) keep a -1 code instead of becoming a group
+            present, codes = present[1:], codes - 1
+        names = inst.cat.categories[present]
+    else:
+        codes, names = pd.factorize(inst, sort=True)
+    return codes, names, len(names)
+
+
+_MISS = object()
+
+
+def _memoized(method):
+    """Cache ``method``'s result per argument tuple until the next data refresh.
+
+    Callers get a deep copy, so mutating a returned result can't corrupt the cache.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self._maybe_refresh()
+        key = (method.__name__, self._cache_generation, args, tuple(sorted(kwargs.items())))
+        with self._memo_lock:
+            result = self._memo.get(key, _MISS)
+        if result is _MISS:
+            result = method(self, *args, **kwargs)
+            with self._memo_lock:
+                self._memo[key] = result
+        return copy.deepcopy(result)
+    return wrapper
 
 
 class AgentService:
     def __init__(self, use_real_data: bool = True) -> None:
         self.use_real_data = use_real_data
         self.data_cache_time = None
-        self.cache_duration = timedelta(hours=1)  # Cache for 1 hour
+        self.docs = None
+        self.retriever = None
+        self.cache_seconds = 3600.0  # Cache for 1 hour
+        self._next_refresh_at = 0.0
+        self._refresh_lock = threading.Lock()
+        self._cache_generation = 0
+        self._memo = LRUCache(maxsize=256)
+        self._memo_lock = threading.Lock()
         self._load_data()
     
+    def _maybe_refresh(self) -> None:
+        """Reload data once the cache has expired; otherwise just a clock read and a compare."""
+        if time.monotonic() < self._next_refresh_at:
+            return
+        # Concurrent requests that all see the expired deadline must reload only once
+        with self._refresh_lock:
+            if time.monotonic() >= self._next_refresh_at:
+                self._load_data()
+    
     def _load_data(self) -> None:
-        """Load data with caching mechanism."""
-        should_refresh = (
-            self.data_cache_time is None or 
-            datetime.now() - self.data_cache_time > self.cache_duration
+        """(Re)load structured data and documents and reset the cache clock."""
+        self.employment_df, self.salary_df, self.support_df = load_structured_data(
+            settings.data_dir, use_real_data=self.use_real_data
         )
-        
-        if should_refresh:
-            self.employment_df, self.salary_df, self.support_df = load_structured_data(
-                settings.data_dir, use_real_data=self.use_real_data
-            )
-            self.docs = load_unstructured_docs(settings.data_dir)
+        self.employment_df = _compact_dtypes(self.employment_df)
+        self.salary_df = _compact_dtypes(self.salary_df)
+        self.support_df = _prepare_support(self.support_df)
+        # Row-position indices, built once per refresh so filters are dict lookups
+        self._emp_by_degree = _row_index(self.employment_df["degree"], fold=True)
+        self._emp_by_inst = _row_index(self.employment_df["institution"], fold=True)
+        self._emp_by_year = _row_index(self.employment_df["year"])
+        self._sal_by_degree = _row_index(self.salary_df["degree"], fold=True)
+        self._sal_by_inst = _row_index(self.salary_df["institution"], fold=True)
+        # Latest-year market context for summarize_outcomes; fixed until the next refresh
+        self._recent_employment = self._recent_employment_context()
+        self._recent_salary = self._recent_salary_context()
+        # The support services listing only depends on support_df, so build it
+        # (and its JSON encoding) once per refresh
+        self._support_services = self._build_support_services()
+        self._support_json_bytes = orjson.dumps(
+            {"institutions": self._support_services}, option=orjson.OPT_SERIALIZE_NUMPY
+        )
+        docs = load_unstructured_docs(settings.data_dir)
+        # Rebuilding the index is the expensive part, so keep the retriever
+        # across refreshes unless the corpus changed or the embedding index
+        # failed to build last time (e.g. a transient network error)
+        degraded = isinstance(self.retriever, GeminiRetriever) and self.retriever.index is None
+        if docs != self.docs or degraded:
+            self.docs = docs
             # Use Gemini retriever if available, otherwise fallback to offline
             if settings.online_mode:
-                self.retriever = GeminiRetriever(self.docs)
+                self.retriever = GeminiRetriever(self.docs, cache_dir=settings.index_cache_dir)
             else:
-                self.retriever = OfflineRetriever(self.docs)
-            self.data_cache_time = datetime.now()
-            print(f"Data refreshed at {self.data_cache_time}")
-        else:
-            print(f"Using cached data from {self.data_cache_time}")
+                self.retriever = OfflineRetriever(self.docs, cache_dir=settings.index_cache_dir)
+        self.data_cache_time = datetime.now()
+        self._next_refresh_at = time.monotonic() + self.cache_seconds
+        # Results memoised against the old frames are stale now
+        with self._memo_lock:
+            self._cache_generation += 1
+            self._memo.clear()
+        print(f"Data refreshed at {self.data_cache_time}")
+
+    def _recent_employment_context(self):
+        """(average rate, leading degree, its rate) for the latest year, or None."""
+        df = self.employment_df
+        recent = df[df["year"] == df["year"].max()]
+        if recent.empty:
+            return None
+        by_degree = recent.groupby("degree", observed=True)["employment_rate"].mean()
+        top = by_degree.values.argmax()
+        return recent["employment_rate"].mean(), by_degree.index[top], by_degree.iloc[top]
+    
+    def _recent_salary_context(self):
+        """(median salary, best-paid degree) for the latest year, or None."""
+        df = self.salary_df
+        recent = df[df["year"] == df["year"].max()]
+        if recent.empty:
+            return None
+        return recent["median_salary"].median(), recent.groupby("degree", observed=True)["median_salary"].mean().idxmax()
 
     # ---------- Core Analyses ----------
+    @_memoized
     def analyze_employment(self, degree: str | None = None, year: int | None = None) -> Dict[str, Any]:
         """Enhanced employment analysis with real-time insights."""
-        self._load_data()  # Ensure fresh data
-        df = self.employment_df.copy()
-        
-        # Apply filters
-        if degree:
-            df = df[df["degree"].str.lower() == degree.lower()]
-        if year:
-            df = df[df["year"] == int(year)]
+        # Apply filters via the row indices; the cached frame is never modified
+        df = self.employment_df
+        if degree or year:
+            rows = self._emp_by_degree.get(degree.casefold(), _NO_ROWS) if degree else None
+            if year:
+                year_rows = self._emp_by_year.get(int(year), _NO_ROWS)
+                rows = year_rows if rows is None else np.intersect1d(rows, year_rows, assume_unique=True)
+            df = df.iloc[rows]
             
         if df.empty:
             return {
@@ -71,38 +241,27 @@ class AgentService:
                 "data_quality": "No data available"
             }
         
-        # Enhanced analysis with NaN/Inf handling
-        grouped = df.groupby(["institution"]).agg({
-            "employment_rate": ["mean", "std", "count"],
-            "median_salary": "mean"
-        }).reset_index()
-        
-        # Flatten column names
-        grouped.columns = ["institution", "avg_employment_rate", "employment_std", "record_count", "avg_salary"]
-        
-        # Handle NaN and Inf values
-        for col in ["avg_employment_rate", "employment_std", "avg_salary"]:
-            grouped[col] = grouped[col].replace([float('inf'), float('-inf')], 0)
-            grouped[col] = grouped[col].fillna(0)
+        # Enhanced analysis with NaN/Inf handling: per-institution stats in a few bincount passes
+        codes, names, n_groups = _group_by_institution(df)
+        count, avg_rate, rate_std = _grouped_moments(codes, n_groups, df["employment_rate"].to_numpy(dtype=float))
+        _, avg_salary, _ = _grouped_moments(codes, n_groups, df["median_salary"].to_numpy(dtype=float))
+        # Zero NaN/Inf (e.g. std of single-record groups) in one pass over the numeric block
+        avg_rate, rate_std, avg_salary = np.nan_to_num(
+            np.vstack([avg_rate, rate_std, avg_salary]), nan=0.0, posinf=0.0, neginf=0.0
+        )
+        grouped = pd.DataFrame({
+            "institution": names,
+            "avg_employment_rate": avg_rate,
+            "employment_std": rate_std,
+            "record_count": count,
+            "avg_salary": avg_salary,
+        })
         
         grouped = grouped.sort_values("avg_employment_rate", ascending=False)
+        top_institutions = grouped.head(5).round(2).to_dict(orient="records")
         
-        # Convert to dict and clean values
-        top_institutions = grouped.head(5).to_dict(orient="records")
-        for item in top_institutions:
-            for key, value in item.items():
-                if isinstance(value, float):
-                    if pd.isna(value) or value == float('inf') or value == float('-inf'):
-                        item[key] = 0
-                    else:
-                        item[key] = round(value, 2)
-        
-        avg_rate = df["employment_rate"].mean()
-        median_salary = df["median_salary"].median()
-        
-        # Clean final values
-        avg_rate = 0 if pd.isna(avg_rate) or avg_rate == float('inf') or avg_rate == float('-inf') else round(avg_rate, 2)
-        median_salary = 0 if pd.isna(median_salary) or median_salary == float('inf') or median_salary == float('-inf') else round(median_salary, 0)
+        avg_rate = round(clean_float_value(df["employment_rate"].mean()), 2)
+        median_salary = round(clean_float_value(df["median_salary"].median()), 0)
         
         # Calculate trends
         if len(df) > 1:
@@ -124,7 +283,7 @@ class AgentService:
 
     def summarize_outcomes(self, question: str, top_k: int = 5) -> Dict[str, Any]:
         """Enhanced outcome summarization with Gemini-powered insights."""
-        self._load_data()  # Ensure fresh data
+        self._maybe_refresh()
         matches = self.retriever.query(question, top_k=top_k)
         combined = "\n\n".join([m["text"] for m in matches])
         
@@ -135,19 +294,14 @@ class AgentService:
             summary = offline_summarize(combined, max_sentences=8)
         
         # Add contextual insights based on current data
-        if "employment" in question.lower() or "job" in question.lower():
-            recent_employment = self.employment_df[self.employment_df["year"] == self.employment_df["year"].max()]
-            if not recent_employment.empty:
-                avg_rate = recent_employment["employment_rate"].mean()
-                top_field = recent_employment.groupby("degree")["employment_rate"].mean().idxmax()
-                summary += f"\n\nCurrent market data shows {avg_rate:.1f}% average employment rate, with {top_field} leading at {recent_employment[recent_employment['degree']==top_field]['employment_rate'].mean():.1f}%."
+        q = question.lower()
+        if ("employment" in q or "job" in q) and self._recent_employment is not None:
+            avg_rate, top_field, top_rate = self._recent_employment
+            summary += f"\n\nCurrent market data shows {avg_rate:.1f}% average employment rate, with {top_field} leading at {top_rate:.1f}%."
         
-        if "salary" in question.lower() or "income" in question.lower():
-            recent_salary = self.salary_df[self.salary_df["year"] == self.salary_df["year"].max()]
-            if not recent_salary.empty:
-                median_salary = recent_salary["median_salary"].median()
-                top_paying_field = recent_salary.groupby("degree")["median_salary"].mean().idxmax()
-                summary += f"\n\nCurrent salary data shows median of ₹{median_salary:,.0f}, with {top_paying_field} graduates earning the highest median salary."
+        if ("salary" in q or "income" in q) and self._recent_salary is not None:
+            median_salary, top_paying_field = self._recent_salary
+            summary += f"\n\nCurrent salary data shows median of ₹{median_salary:,.0f}, with {top_paying_field} graduates earning the highest median salary."
         
         return {
             "question": question, 
@@ -159,14 +313,15 @@ class AgentService:
             "processing_method": "Gemini-powered" if settings.online_mode else "Statistical analysis"
         }
 
+    @_memoized
     def compare_institutions(self, a: str, b: str, year: int | None = None) -> Dict[str, Any]:
         """Enhanced institution comparison with detailed metrics."""
-        self._load_data()  # Ensure fresh data
-        df = self.employment_df.copy()
-        df_ab = df[df["institution"].str.lower().isin([a.lower(), b.lower()])]
-        
+        a_cf, b_cf = a.casefold(), b.casefold()
+        # union1d rather than concatenate so comparing an institution with itself doesn't double-count
+        rows = np.union1d(self._emp_by_inst.get(a_cf, _NO_ROWS), self._emp_by_inst.get(b_cf, _NO_ROWS))
         if year:
-            df_ab = df_ab[df_ab["year"] == int(year)]
+            rows = np.intersect1d(rows, self._emp_by_year.get(int(year), _NO_ROWS), assume_unique=True)
+        df_ab = self.employment_df.iloc[rows]
             
         if df_ab.empty:
             return {
@@ -176,34 +331,27 @@ class AgentService:
             }
         
         # Enhanced comparison metrics with NaN/Inf handling
-        comp = df_ab.groupby(["institution"]).agg({
-            "employment_rate": ["mean", "std", "count"],
-            "median_salary": ["mean", "std"]
-        }).reset_index()
-        
-        # Flatten column names
-        comp.columns = ["institution", "avg_employment_rate", "employment_std", "employment_count", 
-                       "avg_salary", "salary_std"]
-        
-        # Handle NaN and Inf values
-        for col in ["avg_employment_rate", "employment_std", "avg_salary", "salary_std"]:
-            comp[col] = comp[col].replace([float('inf'), float('-inf')], 0)
-            comp[col] = comp[col].fillna(0)
+        codes, names, n_groups = _group_by_institution(df_ab)
+        count, avg_rate, rate_std = _grouped_moments(codes, n_groups, df_ab["employment_rate"].to_numpy(dtype=float))
+        _, avg_salary, salary_std = _grouped_moments(codes, n_groups, df_ab["median_salary"].to_numpy(dtype=float))
+        avg_rate, rate_std, avg_salary, salary_std = np.nan_to_num(
+            np.vstack([avg_rate, rate_std, avg_salary, salary_std]), nan=0.0, posinf=0.0, neginf=0.0
+        )
+        comp = pd.DataFrame({
+            "institution": names,
+            "avg_employment_rate": avg_rate,
+            "employment_std": rate_std,
+            "employment_count": count,
+            "avg_salary": avg_salary,
+            "salary_std": salary_std,
+        })
         
-        # Convert to dict and clean values
-        out = comp.to_dict(orient="records")
-        for item in out:
-            for key, value in item.items():
-                if isinstance(value, float):
-                    if pd.isna(value) or value == float('inf') or value == float('-inf'):
-                        item[key] = 0
-                    else:
-                        item[key] = round(value, 2)
+        out = comp.round(2).to_dict(orient="records")
         
         # Calculate winner
         if len(out) == 2:
-            inst_a_data = next((r for r in out if r["institution"].lower() == a.lower()), None)
-            inst_b_data = next((r for r in out if r["institution"].lower() == b.lower()), None)
+            inst_a_data = next((r for r in out if r["institution"].casefold() == a_cf), None)
+            inst_b_data = next((r for r in out if r["institution"].casefold() == b_cf), None)
             
             if inst_a_data and inst_b_data:
                 emp_winner = a if inst_a_data["avg_employment_rate"] > inst_b_data["avg_employment_rate"] else b
@@ -224,38 +372,58 @@ class AgentService:
 
     def support_services_index(self) -> List[Dict[str, Any]]:
         """Enhanced support services analysis with detailed metrics."""
-        self._load_data()  # Ensure fresh data
-        rows: List[Dict[str, Any]] = []
-        
-        for _, r in self.support_df.iterrows():
-            services = r.get("services", []) if isinstance(r.get("services"), list) else []
-            score = score_support_index(services)
-            
-            # Enhanced metrics
-            career_rating = r.get("career_services_rating", 0)
-            alumni_strength = r.get("alumni_network_strength", 0)
-            data_source = r.get("data_source", "Unknown")
-            last_updated = r.get("last_updated", "Unknown")
-            
-            rows.append({
-                "institution": r.get("institution"),
-                "services": services,
-                "support_index": score,
-                "career_services_rating": round(career_rating, 1),
-                "alumni_network_strength": round(alumni_strength, 1),
-                "total_services": len(services),
-                "data_source": data_source,
-                "last_updated": last_updated
-            })
+        self._maybe_refresh()
+        return self._support_services
+    
+    def support_services_json(self) -> bytes:
+        """``{"institutions": support_services_index()}`` as ready-to-send JSON bytes."""
+        self._maybe_refresh()
+        return self._support_json_bytes
+    
+    def _build_support_services(self) -> List[Dict[str, Any]]:
+        """Support services rows, best support index first."""
+        df = self.support_df
+        n = len(df)
+        
+        def column(name: str, default: Any) -> List[Any]:
+            return df[name].to_list() if name in df.columns else [default] * n
+        
+        institutions = column("institution", None)
+        services_col = df["services"].to_list()
+        scores = df["_support_index"].to_list()
+        n_services = df["_n_services"].to_list()
+        
+        # Enhanced metrics
+        career_ratings = column("career_services_rating", 0)
+        alumni_strengths = column("alumni_network_strength", 0)
+        data_sources = column("data_source", "Unknown")
+        last_updated = column("last_updated", "Unknown")
+        
+        rows = [
+            {
+                "institution": institutions[i],
+                "services": services_col[i],
+                "support_index": scores[i],
+                "career_services_rating": round(career_ratings[i], 1),
+                "alumni_network_strength": round(alumni_strengths[i], 1),
+                "total_services": n_services[i],
+                "data_source": data_sources[i],
+                "last_updated": last_updated[i]
+            }
+            for i in range(n)
+        ]
         
-        return sorted(rows, key=lambda x: x["support_index"], reverse=True)
+        return sorted(rows, key=itemgetter("support_index"), reverse=True)
 
+    @_memoized
     def roi_estimate(self, institution: str, degree: str, tuition_total: float, years: int = 4) -> Dict[str, Any]:
         """Enhanced ROI calculation with comprehensive financial analysis."""
-        self._load_data()  # Ensure fresh data
-        df = self.salary_df.copy()
-        f = (df["institution"].str.lower() == institution.lower()) & (df["degree"].str.lower() == degree.lower())
-        sub = df[f]
+        rows = np.intersect1d(
+            self._sal_by_inst.get(institution.casefold(), _NO_ROWS),
+            self._sal_by_degree.get(degree.casefold(), _NO_ROWS),
+            assume_unique=True,
+        )
+        sub = self.salary_df.iloc[rows]
         
         if sub.empty:
             return {
@@ -265,34 +433,17 @@ class AgentService:
         
         # Enhanced ROI calculations with NaN/Inf handling
         median_salary = sub["median_salary"].median()
-        employment_rate = sub["employment_rate"].median()
-        
-        # Clean values
-        median_salary = 0 if pd.isna(median_salary) or median_salary == float('inf') or median_salary == float('-inf') else float(median_salary)
-        employment_rate = 0 if pd.isna(employment_rate) or employment_rate == float('inf') or employment_rate == float('-inf') else float(employment_rate)
-        
         salary_25th = sub["salary_percentile_25"].median() if "salary_percentile_25" in sub.columns else median_salary * 0.8
         salary_75th = sub["salary_percentile_75"].median() if "salary_percentile_75" in sub.columns else median_salary * 1.3
+        median_salary, employment_rate, salary_25th, salary_75th = map(
+            clean_float_value, (median_salary, sub["employment_rate"].median(), salary_25th, salary_75th)
+        )
         
-        # Clean percentile values
-        salary_25th = 0 if pd.isna(salary_25th) or salary_25th == float('inf') or salary_25th == float('-inf') else float(salary_25th)
-        salary_75th = 0 if pd.isna(salary_75th) or salary_75th == float('inf') or salary_75th == float('-inf') else float(salary_75th)
-        
-        expected_income_first_year = median_salary * (employment_rate / 100.0)
-        years_to_break_even = tuition_total / max(expected_income_first_year, 1.0)
-        
-        # Calculate 5-year and 10-year projections
-        salary_growth_rate = 0.03  # 3% annual growth
-        income_5_year = expected_income_first_year * ((1 + salary_growth_rate) ** 5 - 1) / salary_growth_rate
-        income_10_year = expected_income_first_year * ((1 + salary_growth_rate) ** 10 - 1) / salary_growth_rate
-        
-        # ROI percentage with NaN/Inf handling
-        roi_5_year = ((income_5_year - tuition_total) / tuition_total) * 100 if tuition_total > 0 else 0
-        roi_10_year = ((income_10_year - tuition_total) / tuition_total) * 100 if tuition_total > 0 else 0
-        
-        # Clean ROI values
-        roi_5_year = 0 if pd.isna(roi_5_year) or roi_5_year == float('inf') or roi_5_year == float('-inf') else roi_5_year
-        roi_10_year = 0 if pd.isna(roi_10_year) or roi_10_year == float('inf') or roi_10_year == float('-inf') else roi_10_year
+        # 3% annual salary growth for the 5- and 10-year projections
+        expected_income_first_year, years_to_break_even, _, _, roi_5_year, roi_10_year = _roi_kernel(
+            median_salary, employment_rate, float(tuition_total), 0.03
+        )
+        roi_5_year, roi_10_year = clean_float_value(roi_5_year), clean_float_value(roi_10_year)
         
         # Risk assessment
         risk_level = "Low" if employment_rate > 85 and median_salary > 70000 else "Medium" if employment_rate > 75 else "High"
@@ -315,7 +466,6 @@ class AgentService:
     # ---------- Parent-focused report ----------
     def parent_focused_summary(self, degree: str | None = None, year: int | None = None) -> str:
         """Enhanced parent-focused summary with actionable insights."""
-        self._load_data()  # Ensure fresh data
         emp = self.analyze_employment(degree=degree, year=year)
         bullets = []
         
@@ -352,11 +502,17 @@ class AgentService:
             return synthesize_parent_friendly_insights(bullets)
 
 
+_SERVICES: Dict[bool, AgentService] = {}
+_SERVICE_LOCK = threading.Lock()
+
+
 def get_service(use_real_data: bool = True) -> AgentService:
-    # Basic singleton pattern per process
-    global _SERVICE
-    try:
-        return _SERVICE
-    except NameError:
-        _SERVICE = AgentService(use_real_data=use_real_data)
-        return _SERVICE
+    # One service per data mode per process; the lock makes sure concurrent
+    # first requests don't each load the data
+    svc = _SERVICES.get(use_real_data)
+    if svc is None:
+        with _SERVICE_LOCK:
+            svc = _SERVICES.get(use_real_data)
+            if svc is None:
+                svc = _SERVICES[use_real_data] = AgentService(use_real_data=use_real_data)
+    return svc
@@ -2,12 +2,16 @@ from __future__ import annotations
 
 from fastapi import FastAPI, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel
 from typing import Optional
+import orjson
 
 from .agent.service import get_service
 
-app = FastAPI(title="Agentic AI Insights Generator")
+# Handlers wrap their results in ORJSONResponse themselves, which skips
+# jsonable_encoder; orjson also serialises numpy scalars natively
+app = FastAPI(title="Agentic AI Insights Generator", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -36,41 +40,46 @@ class ROIRequest(BaseModel):
     years: int = 4
 
 
+# The health check never changes, so encode it once
+_ROOT_BYTES = orjson.dumps({
+    "status": "ok", 
+    "service": "Agentic AI Insights Generator",
+    "version": "2.0",
+    "features": ["Real-time data", "Enhanced analytics", "Parent insights", "ROI calculations"]
+})
+
+
 @app.get("/")
 def root():
-    return {
-        "status": "ok", 
-        "service": "Agentic AI Insights Generator",
-        "version": "2.0",
-        "features": ["Real-time data", "Enhanced analytics", "Parent insights", "ROI calculations"]
-    }
+    return Response(content=_ROOT_BYTES, media_type="application/json")
 
 
 @app.post("/analyze")
 def analyze(req: AnalyzeRequest):
     svc = get_service()
-    return svc.analyze_employment(req.degree, req.year)
+    return ORJSONResponse(svc.analyze_employment(req.degree, req.year))
 
 
 @app.get("/insights")
 def insights(q: str = Query(..., description="Question to summarize against reports")):
     svc = get_service()
-    return svc.summarize_outcomes(q)
+    return ORJSONResponse(svc.summarize_outcomes(q))
 
 
 @app.post("/compare")
 def compare(req: CompareRequest):
     svc = get_service()
-    return svc.compare_institutions(req.institution_a, req.institution_b, req.year)
+    return ORJSONResponse(svc.compare_institutions(req.institution_a, req.institution_b, req.year))
 
 
 @app.get("/support-services")
 def support_services():
     svc = get_service()
-    return {"institutions": svc.support_services_index()}
+    # Encoded by the service once per data refresh
+    return Response(content=svc.support_services_json(), media_type="application/json")
 
 
 @app.post("/roi")
 def roi(req: ROIRequest):
     svc = get_service()
-    return svc.roi_estimate(req.institution, req.degree, req.tuition_total, req.years)
+    return ORJSONResponse(svc.roi_estimate(req.institution, req.degree, req.tuition_total, req.years))
@@ -3,15 +3,17 @@
 Simple test script to verify the application components work correctly.
 """
 
-import requests
-import json
+import asyncio
 import sys
-import time
 
-def test_backend_connection():
+import httpx
+
+API_BASE = "http://localhost:8000"
+
+async def check_backend_connection(client):
     """Test if the backend is running and responding."""
     try:
-        response = requests.get("http://localhost:8000/", timeout=5)
+        response = await client.get("/", timeout=5)
         if response.status_code == 200:
             print("✅ Backend is running and responding")
             print(f"   Response: {response.json()}")
@@ -19,18 +21,18 @@ def test_backend_connection():
         else:
             print(f"❌ Backend returned status code: {response.status_code}")
             return False
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         print("❌ Backend is not running. Please start it with: uvicorn backend.main:app --reload")
         return False
     except Exception as e:
         print(f"❌ Error connecting to backend: {e}")
         return False
 
-def test_analyze_endpoint():
+async def check_analyze_endpoint(client):
     """Test the analyze endpoint with sample data."""
     try:
         data = {"degree": "Computer Science", "year": 2025}
-        response = requests.post("http://localhost:8000/analyze", json=data, timeout=10)
+        response = await client.post("/analyze", json=data, timeout=10)
         if response.status_code == 200:
             print("✅ Analyze endpoint working")
             result = response.json()
@@ -43,12 +45,12 @@ def test_analyze_endpoint():
         print(f"❌ Error testing analyze endpoint: {e}")
         return False
 
-def test_gemini_integration():
+async def check_gemini_integration(client):
     """Test if Gemini integration is working."""
     try:
         # Test insights endpoint with a complex question
         question = "What are the career prospects for Computer Science graduates from top Indian institutions?"
-        response = requests.get(f"http://localhost:8000/insights?q={question}", timeout=15)
+        response = await client.get("/insights", params={"q": question}, timeout=15)
         if response.status_code == 200:
             data = response.json()
             print("✅ Gemini 2.5 Flash integration working")
@@ -62,25 +64,28 @@ def test_gemini_integration():
         print(f"❌ Error testing Gemini integration: {e}")
         return False
 
+async def run_tests():
+    """Run the endpoint tests concurrently; total time is the slowest request, not the sum."""
+    async with httpx.AsyncClient(base_url=API_BASE, timeout=20) as client:
+        return await asyncio.gather(
+            check_backend_connection(client),
+            check_analyze_endpoint(client),
+            check_gemini_integration(client),
+        )
+
 def main():
     """Run all tests."""
     print("🧪 Testing Career Outcomes Application")
     print("=" * 50)
+    print("\n🔍 Testing API endpoints...")
+    
+    backend_ok, analyze_ok, gemini_ok = asyncio.run(run_tests())
     
-    # Test backend connection
-    if not test_backend_connection():
+    if not backend_ok:
         print("\n❌ Backend tests failed. Please start the backend first.")
         print("   Run: uvicorn backend.main:app --reload")
         sys.exit(1)
     
-    print("\n🔍 Testing API endpoints...")
-    
-    # Test analyze endpoint
-    analyze_ok = test_analyze_endpoint()
-    
-    # Test Gemini integration
-    gemini_ok = test_gemini_integration()
-    
     print("\n" + "=" * 50)
     if analyze_ok and gemini_ok:
         print("✅ All tests passed! The application is working correctly.")